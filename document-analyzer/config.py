@@ -5,6 +5,16 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     openai_api_key: str
+    enable_cache: bool = True
+    cache_max_size: int = 512
+    enable_semantic_cache: bool = False
+    semantic_cache_threshold: float = 0.97
+    semantic_cache_path: str = "semantic_cache.db"
+    semantic_cache_max_entries: int = 10000
+    parallel_scoring: bool = False
+    pdf_pool_workers: int = 2
+    api_workers: int = 1
+    dev_mode: bool = False
     model_config = SettingsConfigDict(env_file=".env")
 
 
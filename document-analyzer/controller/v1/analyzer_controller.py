@@ -1,9 +1,9 @@
-import json
 from typing import Optional, Dict
 
 from fastapi import APIRouter, Depends, UploadFile, File, Form
+from pydantic import TypeAdapter, ValidationError
 
-from service.analyzer_service import AnalyzerService
+from service.analyzer_service import AnalyzerService, get_analyzer_service
 from utils.response import DocanalyzerResponse, response_formatter
 from utils.logger import logger
 from utils.exception import DocanalyzerException
@@ -11,33 +11,30 @@ from utils.error_code import ErrorCode
 
 analyzer_router = APIRouter(prefix="/v1/analyzer", tags=["Analyzer"])
 
+# Parses and validates the criteria form field in one pass
+_CRITERIA_ADAPTER = TypeAdapter(Dict[str, str])
+
 @analyzer_router.post("/document", response_model=DocanalyzerResponse)
 async def analyze_document_endpoint(
     file: UploadFile = File(..., description="Document file to be analyzed."),
     filename: str = Form(..., description="Filename of the uploaded document."),
     criteria: Optional[str] = Form(None, description="Optional custom grading criteria as a JSON string. E.g., '{\"clarity\": \"Is the document clear?\"}'"),
-    service: AnalyzerService = Depends()
+    service: AnalyzerService = Depends(get_analyzer_service)
 ):
-    try:
-        file_content = await file.read()
-    except Exception as e:
-        logger.error(f"Failed to read uploaded file: {e}")
-        raise DocanalyzerException(*ErrorCode.FILE_READ_ERROR.value)
-    finally:
-        await file.close()
-
     parsed_criteria: Optional[Dict[str, str]] = None
     if criteria:
         try:
-            parsed_criteria = json.loads(criteria)
-            if not isinstance(parsed_criteria, dict):
-                raise DocanalyzerException(*ErrorCode.INVALID_CRITERIA_FORMAT.value, message="Criteria must be a valid JSON object string.")
-        except json.JSONDecodeError:
-            raise DocanalyzerException(*ErrorCode.INVALID_CRITERIA_FORMAT.value, message="Criteria is not a valid JSON string.")
-        except DocanalyzerException as e:
-            raise e
+            parsed_criteria = _CRITERIA_ADAPTER.validate_json(criteria)
+        except ValidationError as e:
+            if any(err["type"] == "json_invalid" for err in e.errors()):
+                raise DocanalyzerException(ErrorCode.INVALID_CRITERIA_FORMAT, message="Criteria is not a valid JSON string.")
+            raise DocanalyzerException(ErrorCode.INVALID_CRITERIA_FORMAT, message="Criteria must be a valid JSON object string.")
         except Exception as e:
-            logger.error(f"Failed to parse criteria JSON: {e}")
-            raise DocanalyzerException(*ErrorCode.INVALID_CRITERIA_FORMAT.value)
+            logger.error("Failed to parse criteria JSON: %s", e)
+            raise DocanalyzerException(ErrorCode.INVALID_CRITERIA_FORMAT)
 
-    return response_formatter(await service.analyze_document(file_content=file_content, filename=filename, criteria=parsed_criteria))
+    # Hand the spooled upload straight to the service instead of reading it into memory
+    try:
+        return response_formatter(await service.analyze_document(file=file.file, filename=filename, criteria=parsed_criteria))
+    finally:
+        await file.close()
@@ -1,7 +1,7 @@
-from datetime import datetime
+import time
 
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 # Import the analyzer router
 from controller.v1.analyzer_controller import analyzer_router
@@ -10,6 +10,7 @@ from utils.error_code import ErrorCode
 from utils.logger import logger
 from utils.exception import DocanalyzerException
 from utils.response import error_response
+from config import settings
 
 app = FastAPI(
     title="Document Analyzer API",
@@ -17,6 +18,13 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Error bodies for the plain ErrorCode messages are constant, serialize them once
+_ERROR_BODIES = {
+    (error.code, error.message): orjson.dumps(error_response(error.code, error.message))
+    for error in ErrorCode
+}
+_GENERIC_500_BYTES = _ERROR_BODIES[(ErrorCode.INTERNAL_SERVER_ERROR.code, ErrorCode.INTERNAL_SERVER_ERROR.message)]
+
 origins = [
     "*",
 ]
@@ -24,7 +32,7 @@ origins = [
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
-    allow_credentials=True,
+    allow_credentials=False, # Credentials can't be combined with a "*" origin; the frontend doesn't send any
     allow_methods=["*"], # Allow all methods (GET, POST, etc.)
     allow_headers=["*"], # Allow all headers
 )
@@ -33,49 +41,54 @@ app.add_middleware(
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     # Log the incoming request
-    logger.info(f"Incoming request: {request.method} {request.url}")
+    logger.info("Incoming request: %s %s", request.method, request.url)
     # Log headers if needed (be careful with sensitive info)
-    # logger.debug(f"Headers: {request.headers}")
+    # logger.debug("Headers: %s", request.headers)
     # Log body if needed (can be large or sensitive, use with caution)
     # try:
     #     body = await request.body()
-    #     logger.debug(f"Body: {body.decode()}")
+    #     logger.debug("Body: %s", body.decode())
     #     # Need to make the body available again for the endpoint
     #     request._body = body 
     # except Exception:
     #     logger.warning("Could not log request body.")
         
-    start_time = datetime.now()
+    start_time = time.perf_counter()
 
     # Process the request
     response = await call_next(request)
 
     # Log the outgoing response
-    process_time = (datetime.now() - start_time).total_seconds()
-    logger.info(f"Outgoing response: {response.status_code} - Processed in {process_time:.4f} sec")
+    process_time = time.perf_counter() - start_time
+    logger.info("Outgoing response: %s - Processed in %.4f sec", response.status_code, process_time)
     return response
 
 
 @app.exception_handler(DocanalyzerException)
 async def docanalyzer_exception_handler(request: Request, exc: DocanalyzerException):
-    logger.error(f"Docanalyzer Exception: {exc.message} (Code: {exc.code})", exc_info=False) # Log less verbosely by default for known exceptions
+    logger.error("Docanalyzer Exception: %s (Code: %s)", exc.message, exc.code, exc_info=False) # Log less verbosely by default for known exceptions
     # Optionally log traceback if needed for specific error codes or debugging
     # if exc.code >= 500:
-    #    logger.exception(f"Docanalyzer Exception Traceback:") 
-    return JSONResponse(
-        status_code=exc.code if exc.code >=400 and exc.code < 600 else 500, # Ensure valid HTTP status code range
-        content=error_response(exc.code, exc.message),
+    #    logger.exception("Docanalyzer Exception Traceback:") 
+    status_code = exc.code if exc.code >=400 and exc.code < 600 else 500 # Ensure valid HTTP status code range
+    body = _ERROR_BODIES.get((exc.code, exc.message))
+    if body is not None:
+        return Response(content=body, status_code=status_code, media_type="application/json")
+    return Response(
+        content=orjson.dumps(error_response(exc.code, exc.message)),
+        status_code=status_code,
+        media_type="application/json"
     )
 
 
 @app.exception_handler(Exception)
 async def unhandled_exception_handler(request: Request, exc: Exception):
-    logger.exception(f"Unhandled Exception: {str(exc)}") # Log full traceback for unexpected errors
+    logger.exception("Unhandled Exception: %s", exc) # Log full traceback for unexpected errors
     # Return a generic 500 error using the defined structure
-    error_info = ErrorCode.INTERNAL_SERVER_ERROR.value
-    return JSONResponse(
+    return Response(
+        content=_GENERIC_500_BYTES,
         status_code=ErrorCode.INTERNAL_SERVER_ERROR.code, # Use code from Enum
-        content=error_response(error_info[0], error_info[1])
+        media_type="application/json"
     )
 
 # Include the analyzer router
@@ -90,6 +103,9 @@ async def read_root():
 if __name__ == "__main__":
     import uvicorn
     logger.info("Starting Document Analyzer API...")
-    # Use reload=True for development, remove or set to False for production
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    if settings.dev_mode:
+        # Auto-reload on code changes, single process
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools", workers=settings.api_workers)
 
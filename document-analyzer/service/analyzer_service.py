@@ -1,15 +1,27 @@
 import os
 import json
-import io
-from openai import OpenAI
+import asyncio
+import hashlib
+import statistics
+import threading
+import multiprocessing
+import orjson
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from openai import AsyncOpenAI
 from model.dto import AnalyzeResponse
-from typing import Dict, Optional
-import pypdf
-import docx
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Optional, Tuple
 from utils.logger import logger
 from utils.exception import DocanalyzerException
 from utils.error_code import ErrorCode
 from config import settings
+from service.document_parser import parse_document, parse_pdf_bytes
+from service.tokenizer import LLM_MODEL
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime: hnswlib is only needed when the semantic cache is enabled
+    from service.semantic_cache import SemanticCache
 
 
 DEFAULT_CRITERIA = {
@@ -20,46 +32,183 @@ DEFAULT_CRITERIA = {
     "Engagement": "Is the content engaging and interesting to the target audience (teachers/students)?"
 }
 
+# Cheaper model used for the per-criterion calls when settings.parallel_scoring is enabled
+SCORING_MODEL = "gpt-4o-mini"
+
+# PDFs larger than this are parsed in the process pool instead of a thread
+LARGE_PDF_BYTES = 5 * 1024 * 1024
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _format_criteria(criteria: Dict[str, str]) -> str:
+    return "\n".join([f"- {k}: {v}" for k, v in criteria.items()])
+
+
+def _build_system_prompt(criteria_str: str) -> str:
+    """Everything in the analysis prompt except the document, which the user message carries."""
+    return f"""You are a helpful teaching assistant providing document feedback and grading.
+Analyze the document content in the user message based on the provided criteria.
+
+**Grading Criteria:**
+{criteria_str}
+
+**Instructions:**
+1. Provide constructive, specific feedback addressing strengths and weaknesses based on the criteria. If the document content is empty or very short, state that analysis is limited.
+2. For each criterion listed above, provide a score from 0 to 100. Assign lower scores (e.g., 0) if the content is insufficient for evaluation.
+3. Format your response as a JSON object with two keys: 'feedback' (string) and 'scores' (a dictionary where keys are the criteria names and values are the scores).
+   Example JSON format: {{"feedback": "Overall feedback here...", "scores": {{"Clarity": 85, "Correctness": 92, ...}}}}
+"""
+
+
+# The system prompt for the default rubric is identical on every request, build it once
+_DEFAULT_SYSTEM_PROMPT = _build_system_prompt(_format_criteria(DEFAULT_CRITERIA))
+
+_USER_PROMPT_TEMPLATE = """
+**Document Content:**
+{content}
+
+**Response (JSON format only):**
+"""
+
+# Process-local LRU of finished analyses, keyed by document + criteria hash
+_RESULT_CACHE: "OrderedDict[str, AnalyzeResponse]" = OrderedDict()
+
+
+# Embedding-similarity cache for near-duplicate documents, opened on first use
+_SEMANTIC_CACHE: Optional["SemanticCache"] = None
+_SEMANTIC_CACHE_LOCK = threading.Lock()
+
+
+def _open_semantic_cache() -> "SemanticCache":
+    """Blocking: opens the sqlite file and rebuilds the index from its rows."""
+    global _SEMANTIC_CACHE
+    with _SEMANTIC_CACHE_LOCK:
+        if _SEMANTIC_CACHE is None:
+            from service.semantic_cache import SemanticCache
+            _SEMANTIC_CACHE = SemanticCache(settings.semantic_cache_path, settings.semantic_cache_threshold, settings.semantic_cache_max_entries)
+    return _SEMANTIC_CACHE
+
+
+async def _get_semantic_cache() -> Optional["SemanticCache"]:
+    if not settings.enable_semantic_cache:
+        return None
+    if _SEMANTIC_CACHE is not None:
+        return _SEMANTIC_CACHE
+    # The first request of each worker opens it in a thread; the lock makes concurrent first requests share one
+    return await asyncio.to_thread(_open_semantic_cache)
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Creates the PDF process pool on first use. Workers are forked from a single-threaded
+    forkserver that only preloads the parser module, never from this threaded process.
+    """
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["service.document_parser"])
+        _PDF_POOL = ProcessPoolExecutor(max_workers=settings.pdf_pool_workers, mp_context=context)
+    return _PDF_POOL
+
+
+def _reset_pdf_pool(pool: ProcessPoolExecutor):
+    """Discards a broken pool, unless a concurrent request already replaced it."""
+    global _PDF_POOL
+    if _PDF_POOL is pool:
+        _PDF_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _criteria_hash(criteria: Dict[str, str]) -> str:
+    return hashlib.blake2b(json.dumps(criteria, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _file_size(file: BinaryIO) -> int:
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def _cache_key(file: BinaryIO, filename: str, criteria: Dict[str, str]) -> str:
+    """Builds the exact-match cache key from the raw upload, its extension and the criteria used."""
+    # The extension picks the parser, so identical bytes under another extension must not collide
+    file_ext = os.path.splitext(filename)[1].lower()
+    file.seek(0)
+    content_hash = hashlib.file_digest(file, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+    file.seek(0)
+    return f"{file_ext}:{content_hash}:{_criteria_hash(criteria)}"
+
+
+def _create_openai_client() -> Optional[AsyncOpenAI]:
+    # The API key is automatically picked up from the OPENAI_API_KEY environment variable
+    try:
+        client = AsyncOpenAI(api_key=settings.openai_api_key)
+        logger.info("OpenAI client initialized successfully.")
+        return client
+    except Exception as e:
+        logger.error("Failed to initialize OpenAI client: %s", e)
+        # Depending on the application, you might want to raise the exception
+        # or handle it in a way that the application can still run in a degraded mode.
+        return None
+
 
 class AnalyzerService:
     def __init__(self):
-        # Initialize OpenAI client
-        # The API key is automatically picked up from the OPENAI_API_KEY environment variable
-        try:
-            self.openai_client = OpenAI(api_key=settings.openai_api_key)
-            # Test connection (optional, but good practice)
-            self.openai_client.models.list()
-            logger.info("OpenAI client initialized successfully.")
-        except Exception as e:
-            logger.error(f"Failed to initialize OpenAI client: {e}")
-            # Depending on the application, you might want to raise the exception
-            # or handle it in a way that the application can still run in a degraded mode.
-            self.openai_client = None
+        self.async_client = _create_openai_client()
 
     # --- Modify signature to accept filename ---
-    async def analyze_document(self, file_content: bytes, filename: str, criteria: Optional[Dict[str, str]] = None) -> Optional[AnalyzeResponse]:
-        logger.info(f"Starting analysis for file: {filename}")
+    async def analyze_document(self, file: BinaryIO, filename: str, criteria: Optional[Dict[str, str]] = None) -> Optional[AnalyzeResponse]:
+        logger.info("Starting analysis for file: %s", filename)
+
+        # Use default criteria if none provided
+        final_criteria = criteria if criteria else DEFAULT_CRITERIA
+
+        try:
+            # Uploads over 1 MB are spooled to disk, so measuring and hashing them is blocking I/O
+            file_size = await asyncio.to_thread(_file_size, file)
+            cache_key = await asyncio.to_thread(_cache_key, file, filename, final_criteria) if settings.enable_cache else None
+        except OSError as e:
+            logger.error("Failed to read uploaded file: %s", e)
+            raise DocanalyzerException(ErrorCode.FILE_READ_ERROR)
+
+        # Return the previous analysis if this exact document was graded with the same criteria
+        if cache_key is not None:
+            cached = _RESULT_CACHE.get(cache_key)
+            if cached is not None:
+                _RESULT_CACHE.move_to_end(cache_key)
+                logger.info("Cache hit for file: %s", filename)
+                return cached.model_copy(deep=True)
 
         # 1. Parse the document content
         # --- Pass filename to parser ---
-        parsed_content = await self._parse_document_content(file_content, filename)
+        parsed_content = await self._parse_document_content(file, file_size, filename)
         if parsed_content is None: # Check for None explicitly
-            logger.error(f"Document parsing failed for {filename}. Aborting analysis.")
+            logger.error("Document parsing failed for %s. Aborting analysis.", filename)
             # Use a more specific error? Consider adding ErrorCode.DOCUMENT_EMPTY_ERROR
-            raise DocanalyzerException(*ErrorCode.DOCUMENT_PARSING_ERROR.value)
+            raise DocanalyzerException(ErrorCode.DOCUMENT_PARSING_ERROR)
         elif not parsed_content.strip(): # Handle case where parsing succeeds but yields empty content
-             logger.warning(f"Document parsing yielded empty content for {filename}. Proceeding with empty content.")
-             # Option: raise DocanalyzerException(*ErrorCode.DOCUMENT_EMPTY_ERROR.value) # Create this error code if needed
+             logger.warning("Document parsing yielded empty content for %s. Proceeding with empty content.", filename)
+             # Option: raise DocanalyzerException(ErrorCode.DOCUMENT_EMPTY_ERROR) # Create this error code if needed
 
-        # Use default criteria if none provided
-        final_criteria = criteria if criteria else DEFAULT_CRITERIA
-        logger.info(f"Using criteria: {list(final_criteria.keys())}")
+        logger.info("Using criteria: %s", list(final_criteria.keys()))
+
+        # Reuse the analysis of a near-identical document graded with the same criteria
+        semantic_cache = await _get_semantic_cache()
+        embedding = None
+        if semantic_cache is not None and parsed_content.strip():
+            embedding = await self._embed_content(parsed_content)
+            if embedding is not None:
+                cached = await asyncio.to_thread(semantic_cache.lookup, _criteria_hash(final_criteria), embedding, parsed_content)
+                if cached is not None:
+                    logger.info("Semantic cache hit for file: %s", filename)
+                    return cached
 
         # 2. Call LLM for feedback and scores
-        analysis_result = self._call_llm_for_analysis(parsed_content, final_criteria)
+        analysis_result = await self._call_llm_for_analysis(parsed_content, final_criteria)
         if not analysis_result:
             logger.error("LLM analysis failed. Aborting analysis.")
-            raise DocanalyzerException(*ErrorCode.LLM_ANALYSIS_ERROR.value)
+            raise DocanalyzerException(ErrorCode.LLM_ANALYSIS_ERROR)
 
         # 3. Calculate overall score (optional)
         scores = analysis_result.get('scores', {})
@@ -67,11 +216,10 @@ class AnalyzerService:
         if scores:
             try:
                 # Ensure scores are numeric (float or int)
-                numeric_scores = {k: float(v) for k, v in scores.items()}
-                overall_score = sum(numeric_scores.values()) / len(numeric_scores) if numeric_scores else 0
-                logger.info(f"Calculated overall score: {overall_score:.2f}")
+                overall_score = statistics.fmean(float(v) for v in scores.values())
+                logger.info("Calculated overall score: %.2f", overall_score)
             except (ValueError, TypeError) as e:
-                logger.warning(f"Could not calculate overall score due to invalid score format: {e}. Scores: {scores}")
+                logger.warning("Could not calculate overall score due to invalid score format: %s. Scores: %s", e, scores)
                 overall_score = None  # Set to None if calculation fails
 
         # 4. Create response DTO
@@ -83,96 +231,57 @@ class AnalyzerService:
             # parsed_content=parsed_content
         )
 
-        logger.info(f"Analysis complete for file: {filename}")
+        if cache_key is not None:
+            _RESULT_CACHE[cache_key] = response
+            _RESULT_CACHE.move_to_end(cache_key)
+            while len(_RESULT_CACHE) > settings.cache_max_size:
+                _RESULT_CACHE.popitem(last=False)
+        if embedding is not None:
+            await asyncio.to_thread(semantic_cache.store, _criteria_hash(final_criteria), embedding, parsed_content, response)
+
+        logger.info("Analysis complete for file: %s", filename)
         return response
 
-    # --- Modify signature and implementation ---
-    async def _parse_document_content(self, file_content: bytes, filename: str) -> Optional[str]:
-        """Parses the document content based on filename extension."""
+    async def _parse_document_content(self, file: BinaryIO, file_size: int, filename: str) -> Optional[str]:
+        """Parses the document content without blocking the event loop."""
+        file_ext = os.path.splitext(filename)[1].lower()
+        if file_ext == ".pdf" and file_size > LARGE_PDF_BYTES:
+            # Large PDFs are CPU bound in pypdf, parse them in a separate process to escape the GIL
+            file_content = await asyncio.to_thread(file.read)
+            loop = asyncio.get_running_loop()
+            pool = _get_pdf_pool()
+            try:
+                return await loop.run_in_executor(pool, parse_pdf_bytes, file_content, filename)
+            except BrokenProcessPool as e:
+                # A worker died (OOM, crash on a hostile PDF) and the pool is unusable from now on;
+                # drop it so the next large PDF gets a fresh one. Often this PDF caused it, so no retry
+                logger.error("PDF worker pool broke while parsing %s: %s", filename, e)
+                _reset_pdf_pool(pool)
+                return None
+        return await asyncio.to_thread(parse_document, file, filename)
+
+    async def _embed_content(self, content: str) -> Optional[List[float]]:
+        """Embeds the start of the document for semantic cache lookups. Returns None on failure."""
+        if not self.async_client:
+            return None
+        from service.semantic_cache import EMBEDDING_MODEL, embedding_input
         try:
-            file_ext = os.path.splitext(filename)[1].lower()
-            text_content = ""
-            file_stream = io.BytesIO(file_content) # Use BytesIO for in-memory processing
-
-            logger.info(f"Attempting to parse file '{filename}' with extension '{file_ext}'")
-
-            if file_ext == ".pdf":
-                # Use pypdf
-                reader = pypdf.PdfReader(file_stream)
-                num_pages = len(reader.pages)
-                logger.info(f"Detected PDF with {num_pages} pages.")
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text: # Append only if text extraction was successful
-                        text_content += page_text + "\\n"
-            elif file_ext == ".docx":
-                # Use python-docx
-                document = docx.Document(file_stream)
-                logger.info(f"Detected DOCX document.")
-                for para in document.paragraphs:
-                    text_content += para.text + "\\n"
-            elif file_ext == ".md":
-                # Use markdown library - needs decoding
-                # Assuming UTF-8, adjust if other encodings are expected
-                try:
-                    markdown_text = file_content.decode('utf-8')
-                    # Passing raw Markdown might be sufficient for the LLM.
-                    # Alternatively, convert to HTML then strip tags, or use a plain text extractor.
-                    text_content = markdown_text
-                    logger.info(f"Detected Markdown document.")
-                except UnicodeDecodeError as e:
-                    logger.error(f"Failed to decode Markdown file {filename} as UTF-8: {e}")
-                    return None # Indicate decoding failure
-            # Add handling for plain text files explicitly
-            elif file_ext == ".txt":
-                try:
-                    text_content = file_content.decode('utf-8')
-                    logger.info(f"Detected plain text file (txt).")
-                except UnicodeDecodeError as e:
-                    logger.error(f"Failed to decode text file {filename} as UTF-8: {e}")
-                    return None
-            else:
-                logger.warning(f"Unsupported file extension '{file_ext}' for file {filename}.")
-                # Consider adding ErrorCode.UNSUPPORTED_FILE_TYPE
-                # raise DocanalyzerException(*ErrorCode.UNSUPPORTED_FILE_TYPE.value)
-                return None # Indicate failure for unsupported types
-
-            logger.info(f"Successfully parsed content from {filename}.")
-            # Check if content is empty after parsing
-            if not text_content.strip():
-                 logger.warning(f"Parsing resulted in empty content for file {filename}.")
-                 # Return empty string or None based on desired behavior for empty files
-                 # Returning empty string allows processing (e.g., LLM saying "document is empty")
-                 # Returning None would trigger the DOCUMENT_PARSING_ERROR earlier
-
-            return text_content.strip() # Return stripped text
-
-        # Specific exception for PDF reading errors
-        except pypdf.errors.PdfReadError as e:
-             logger.error(f"Failed to parse PDF file {filename} with PyPDF2: {e}")
-             return None
-        # Catch potential errors from python-docx (e.g., invalid format)
-        except Exception as e: # Consider more specific exceptions for docx if available
-             # Example check if it's a docx error, though python-docx might raise generic exceptions
-             if file_ext == ".docx":
-                 logger.error(f"Failed to parse DOCX file {filename}: {e}")
-             else:
-                 logger.error(f"An unexpected error occurred during parsing of {filename}: {e}")
-             return None # Indicate failure
-
-
-    def _call_llm_for_analysis(self, content: str, criteria: Dict[str, str]) -> Optional[Dict]:
+            response = await self.async_client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=embedding_input(content)
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning("Failed to embed document content, skipping semantic cache: %s", e)
+            return None
+
+    async def _call_llm_for_analysis(self, content: str, criteria: Dict[str, str]) -> Optional[Dict]:
         """Calls the LLM to get feedback and scores based on the content and criteria."""
-        if not self.openai_client:
+        if not self.async_client:
             logger.error("OpenAI client is not initialized. Cannot perform analysis.")
             return None
 
-        # Handle potentially very long content - check token limits? Truncate?
-        # This is a basic implementation. Consider token counting & truncation if needed.
-        MAX_CHARS = 128000 # Define constant for clarity
-        if len(content) > MAX_CHARS:
-            logger.warning(f"Content length ({len(content)} chars) is very long. Truncating to {MAX_CHARS} chars for LLM analysis.")
-            content = content[:MAX_CHARS] + "\n... [Content Truncated]"
+        # content was already cut to the token budget by the parser, see service.document_parser
 
         # Handle empty content explicitly before calling LLM
         if not content.strip():
@@ -183,32 +292,22 @@ class AnalyzerService:
                  "scores": {key: 0 for key in criteria.keys()} # Assign 0 scores for empty doc
              }
 
-        criteria_str = "\n".join([f"- {k}: {v}" for k, v in criteria.items()])
-        prompt = f"""
-Please act as a teaching assistant. Analyze the following document content based on the provided criteria.
-
-**Document Content:**
-{content}
-
-**Grading Criteria:**
-{criteria_str}
+        if settings.parallel_scoring:
+            return await self._call_llm_parallel(content, criteria)
 
-**Instructions:**
-1. Provide constructive, specific feedback addressing strengths and weaknesses based on the criteria. If the document content is empty or very short, state that analysis is limited.
-2. For each criterion listed above, provide a score from 0 to 100. Assign lower scores (e.g., 0) if the content is insufficient for evaluation.
-3. Format your response as a JSON object with two keys: 'feedback' (string) and 'scores' (a dictionary where keys are the criteria names and values are the scores).
-   Example JSON format: {{"feedback": "Overall feedback here...", "scores": {{"Clarity": 85, "Correctness": 92, ...}}}}
-
-**Response (JSON format only):**
-"""
+        # Static instructions and criteria go first so requests share a cacheable prompt prefix
+        if criteria is DEFAULT_CRITERIA:
+            system_prompt = _DEFAULT_SYSTEM_PROMPT
+        else:
+            system_prompt = _build_system_prompt(_format_criteria(criteria))
+        prompt = _USER_PROMPT_TEMPLATE.format(content=content)
 
         try:
             logger.info("Sending request to OpenAI API...")
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o",  # Or your preferred model
+            response = await self.async_client.chat.completions.create(
+                model=LLM_MODEL,
                 messages=[
-                    {"role": "system",
-                     "content": "You are a helpful teaching assistant providing document feedback and grading."},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.5,  # Adjust for creativity vs. consistency
@@ -218,7 +317,7 @@ Please act as a teaching assistant. Analyze the following document content based
             logger.info("Received response from OpenAI API.")
 
             # Parse the JSON response from the LLM
-            analysis_result = json.loads(response_content)
+            analysis_result = orjson.loads(response_content)
 
             # Basic validation of the received structure
             if 'feedback' not in analysis_result or 'scores' not in analysis_result:
@@ -231,9 +330,97 @@ Please act as a teaching assistant. Analyze the following document content based
 
             return analysis_result
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response from LLM: {e}. Response content: {response_content}")
+        except orjson.JSONDecodeError as e:
+            logger.error("Failed to parse JSON response from LLM: %s. Response content: %s", e, response_content)
             return None
         except Exception as e:
-            logger.error(f"Error calling OpenAI API: {e}")
+            logger.error("Error calling OpenAI API: %s", e)
+            return None
+
+    async def _call_llm_parallel(self, content: str, criteria: Dict[str, str]) -> Optional[Dict]:
+        """Scores every criterion and writes the feedback in concurrent LLM calls."""
+        logger.info("Sending %s concurrent requests to OpenAI API...", len(criteria) + 1)
+        feedback, *scores = await asyncio.gather(
+            self._generate_feedback(content, criteria),
+            *(self._score_one(content, name, description) for name, description in criteria.items())
+        )
+        if feedback is None or any(score is None for score in scores):
             return None
+        return {"feedback": feedback, "scores": dict(scores)}
+
+    async def _generate_feedback(self, content: str, criteria: Dict[str, str]) -> Optional[str]:
+        criteria_str = _format_criteria(criteria)
+        prompt = f"""
+Please act as a teaching assistant. Provide constructive, specific feedback on the following document content, addressing strengths and weaknesses based on the provided criteria. If the document content is empty or very short, state that analysis is limited.
+
+**Document Content:**
+{content}
+
+**Grading Criteria:**
+{criteria_str}
+
+**Feedback:**
+"""
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[
+                    {"role": "system",
+                     "content": "You are a helpful teaching assistant providing document feedback."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.5
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            logger.error("Error calling OpenAI API for feedback: %s", e)
+            return None
+
+    async def _score_one(self, content: str, name: str, description: str) -> Optional[Tuple[str, float]]:
+        prompt = f"""
+Please act as a teaching assistant. Score the following document content from 0 to 100 on a single criterion. Assign lower scores (e.g., 0) if the content is insufficient for evaluation.
+
+**Document Content:**
+{content}
+
+**Criterion:**
+- {name}: {description}
+
+**Response (JSON format only):** {{"score": <number>}}
+"""
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=SCORING_MODEL,
+                messages=[
+                    {"role": "system",
+                     "content": "You are a helpful teaching assistant grading documents."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0,
+                response_format={"type": "json_object"}
+            )
+            response_content = response.choices[0].message.content
+            return name, float(orjson.loads(response_content)["score"])
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.error("Invalid score response from LLM for criterion '%s': %s", name, e)
+            return None
+        except Exception as e:
+            logger.error("Error calling OpenAI API for criterion '%s': %s", name, e)
+            return None
+
+
+# Built on first use; the service holds no per-request state, so one instance (and one
+# OpenAI client connection pool) serves every request
+_ANALYZER_SERVICE: Optional[AnalyzerService] = None
+
+
+async def get_analyzer_service() -> AnalyzerService:
+    """
+    FastAPI dependency returning the shared AnalyzerService. Async so FastAPI calls it on
+    the event loop instead of the threadpool; with no await in between, the check and the
+    assignment can't interleave, so concurrent first requests build a single instance.
+    """
+    global _ANALYZER_SERVICE
+    if _ANALYZER_SERVICE is None:
+        _ANALYZER_SERVICE = AnalyzerService()
+    return _ANALYZER_SERVICE
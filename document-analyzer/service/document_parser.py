@@ -0,0 +1,117 @@
+"""
+Document text extraction. Parsers return text already cut to the LLM token budget, so
+tokenizing happens here, off the event loop. Kept free of import-time side effects
+because the PDF process pool workers import this module.
+"""
+import io
+import os
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+import docx
+import pypdf
+
+from service.tokenizer import MAX_CONTENT_TOKENS, count_tokens, truncate_to_token_budget
+from utils.logger import logger
+
+
+def _parse_pdf(file: BinaryIO, filename: str) -> Optional[str]:
+    try:
+        reader = pypdf.PdfReader(file)
+        num_pages = len(reader.pages)
+        logger.info("Detected PDF with %s pages.", num_pages)
+        parts: List[str] = []
+        # Every token covers at least one UTF-8 byte, so the byte count bounds the token count.
+        # Exact counting only starts once that bound passes the budget.
+        byte_count = 0
+        token_count: Optional[int] = None
+        for page_number, page in enumerate(reader.pages, start=1):
+            page_text = page.extract_text()
+            if not page_text: # Skip pages where text extraction failed
+                continue
+            if token_count is None:
+                byte_count += len(page_text.encode("utf-8")) + 1 # + the joining newline
+                if byte_count <= MAX_CONTENT_TOKENS:
+                    parts.append(page_text)
+                    continue
+                token_count = count_tokens("\n".join(parts))
+            page_tokens = count_tokens(page_text)
+            separator_tokens = 1 if parts else 0 # The newline joining this page to the previous one
+            if token_count + separator_tokens + page_tokens > MAX_CONTENT_TOKENS:
+                # Anything past the LLM token budget would be truncated anyway, skip extracting it
+                remaining = max(MAX_CONTENT_TOKENS - token_count - separator_tokens, 0)
+                parts.append(truncate_to_token_budget(page_text, remaining))
+                if page_number < num_pages:
+                    logger.info("Token budget reached after %s of %s pages, skipping the rest.", page_number, num_pages)
+                break
+            parts.append(page_text)
+            token_count += separator_tokens + page_tokens
+        return "\n".join(parts)
+    except pypdf.errors.PdfReadError as e:
+        logger.error("Failed to parse PDF file %s with pypdf: %s", filename, e)
+        return None
+
+
+def _parse_docx(file: BinaryIO, filename: str) -> Optional[str]:
+    try:
+        document = docx.Document(file)
+        logger.info("Detected DOCX document.")
+        return truncate_to_token_budget("\n".join(para.text for para in document.paragraphs))
+    except Exception as e: # python-docx raises generic exceptions (e.g. BadZipFile, KeyError) for invalid files
+        logger.error("Failed to parse DOCX file %s: %s", filename, e)
+        return None
+
+
+def _parse_text_utf8(file: BinaryIO, filename: str) -> Optional[str]:
+    # Markdown is passed to the LLM as is, the raw syntax is readable enough
+    # Assuming UTF-8, adjust if other encodings are expected
+    try:
+        text_content = file.read().decode('utf-8')
+        logger.info("Detected text document.")
+        return truncate_to_token_budget(text_content)
+    except UnicodeDecodeError as e:
+        logger.error("Failed to decode file %s as UTF-8: %s", filename, e)
+        return None
+
+
+_PARSERS: Dict[str, Callable[[BinaryIO, str], Optional[str]]] = {
+    ".pdf": _parse_pdf,
+    ".docx": _parse_docx,
+    ".md": _parse_text_utf8,
+    ".txt": _parse_text_utf8,
+}
+
+
+def parse_document(file: BinaryIO, filename: str) -> Optional[str]:
+    """Parses the document content based on filename extension. Blocking, run it off the event loop."""
+    file_ext = os.path.splitext(filename)[1].lower()
+    parser = _PARSERS.get(file_ext)
+    if parser is None:
+        logger.warning("Unsupported file extension '%s' for file %s.", file_ext, filename)
+        # Consider adding ErrorCode.UNSUPPORTED_FILE_TYPE
+        # raise DocanalyzerException(ErrorCode.UNSUPPORTED_FILE_TYPE)
+        return None # Indicate failure for unsupported types
+
+    logger.info("Attempting to parse file '%s' with extension '%s'", filename, file_ext)
+    file.seek(0) # Parsers read straight from the file handle
+    try:
+        text_content = parser(file, filename)
+    except Exception as e:
+        logger.error("An unexpected error occurred during parsing of %s: %s", filename, e)
+        return None
+    if text_content is None:
+        return None
+
+    logger.info("Successfully parsed content from %s.", filename)
+    # Check if content is empty after parsing
+    if not text_content.strip():
+         logger.warning("Parsing resulted in empty content for file %s.", filename)
+         # Return empty string or None based on desired behavior for empty files
+         # Returning empty string allows processing (e.g., LLM saying "document is empty")
+         # Returning None would trigger the DOCUMENT_PARSING_ERROR earlier
+
+    return text_content.strip() # Return stripped text
+
+
+def parse_pdf_bytes(file_content: bytes, filename: str) -> Optional[str]:
+    """Process pool entry point, file handles can't be sent to another process."""
+    return parse_document(io.BytesIO(file_content), filename)
@@ -0,0 +1,149 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import hnswlib
+import numpy as np
+
+from model.dto import AnalyzeResponse
+from utils.logger import logger
+
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+EMBEDDING_INPUT_CHARS = 8000
+INITIAL_INDEX_SIZE = 1024
+# Nearest neighbours checked per lookup, the closest one may fail the tail check
+LOOKUP_CANDIDATES = 5
+
+
+def _normalize(content: str) -> str:
+    return " ".join(content.split())
+
+
+def embedding_input(content: str) -> str:
+    """The part of the document that is embedded: its first EMBEDDING_INPUT_CHARS, whitespace-normalized."""
+    return _normalize(content)[:EMBEDDING_INPUT_CHARS]
+
+
+def _tail_digest(content: str) -> str:
+    # Text past the embedded prefix must match exactly (up to whitespace), otherwise two
+    # submissions sharing a long template would look identical to the embedding
+    return hashlib.blake2b(_normalize(content)[EMBEDDING_INPUT_CHARS:].encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SemanticCache:
+    """
+    Near-duplicate cache for analyses, backed by a single hnswlib cosine index. Every entry
+    is tagged with its criteria bucket and lookups only consider entries of the same bucket,
+    so documents graded against different rubrics never match each other. Memory is bounded
+    by max_entries however many distinct criteria are seen.
+    Entries are persisted to sqlite, which is shared by all API workers: each worker picks
+    up rows written by the others before a lookup, and the oldest entries beyond
+    max_entries are evicted from both sqlite and memory.
+    Blocking (sqlite I/O), call it through asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: str, threshold: float, max_entries: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._index = hnswlib.Index(space="cosine", dim=EMBEDDING_DIM)
+        self._index.init_index(max_elements=min(INITIAL_INDEX_SIZE, max_entries), allow_replace_deleted=True)
+        self._index.set_ef(50)
+        self._bucket_sizes: Dict[str, int] = {}
+        # row id -> (bucket, tail digest, result), oldest first
+        self._entries: "OrderedDict[int, Tuple[str, str, AnalyzeResponse]]" = OrderedDict()
+        self._last_id = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL lets the other workers keep reading while one of them writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_cache ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "bucket TEXT NOT NULL, "
+            "embedding BLOB NOT NULL, "
+            "tail_digest TEXT NOT NULL, "
+            "result TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        with self._lock:
+            self._sync()
+        logger.info("Semantic cache loaded with %s entries.", len(self._entries))
+
+    def _sync(self):
+        """Loads rows added since the last sync (by any worker), newest max_entries at most."""
+        rows = self._conn.execute(
+            "SELECT id, bucket, embedding, tail_digest, result FROM semantic_cache "
+            "WHERE id > ? ORDER BY id DESC LIMIT ?",
+            (self._last_id, self.max_entries),
+        ).fetchall()
+        for row_id, bucket, embedding, tail_digest, result in reversed(rows):
+            # Evict before adding so the index never holds more than max_entries live items
+            if len(self._entries) >= self.max_entries:
+                self._evict_oldest()
+            self._add_to_index(row_id, np.frombuffer(embedding, dtype=np.float32))
+            self._entries[row_id] = (bucket, tail_digest, AnalyzeResponse.model_validate_json(result))
+            self._bucket_sizes[bucket] = self._bucket_sizes.get(bucket, 0) + 1
+            self._last_id = row_id
+
+    def _evict_oldest(self):
+        row_id, (bucket, _, _) = self._entries.popitem(last=False)
+        self._index.mark_deleted(row_id)
+        self._bucket_sizes[bucket] -= 1
+        if self._bucket_sizes[bucket] == 0:
+            del self._bucket_sizes[bucket]
+
+    def _add_to_index(self, row_id: int, vector: np.ndarray):
+        # Every slot is live, otherwise an evicted entry's slot is reused
+        if len(self._entries) >= self._index.get_max_elements():
+            self._index.resize_index(min(self._index.get_max_elements() * 2, self.max_entries))
+        self._index.add_items(vector.reshape(1, -1), [row_id], num_threads=1, replace_deleted=True)
+
+    def lookup(self, bucket: str, embedding: List[float], content: str) -> Optional[AnalyzeResponse]:
+        """Returns the stored analysis of a matching document if one is similar enough, else None."""
+        tail_digest = _tail_digest(content)
+        with self._lock:
+            self._sync()
+            size = self._bucket_sizes.get(bucket, 0)
+            if size == 0:
+                return None
+            entries = self._entries
+            try:
+                labels, distances = self._index.knn_query(
+                    np.asarray(embedding, dtype=np.float32).reshape(1, -1),
+                    k=min(LOOKUP_CANDIDATES, size),
+                    num_threads=1,
+                    filter=lambda label: label in entries and entries[label][0] == bucket,
+                )
+            except RuntimeError as e: # Not enough reachable neighbours in this bucket
+                logger.warning("Semantic cache lookup failed, treating it as a miss: %s", e)
+                return None
+            for label, distance in zip(labels[0], distances[0]):
+                # hnswlib's cosine distance is 1 - cosine similarity
+                similarity = 1.0 - float(distance)
+                if similarity < self.threshold:
+                    break
+                _, stored_tail_digest, result = entries[int(label)]
+                if stored_tail_digest == tail_digest:
+                    logger.info("Semantic cache hit with similarity %.4f", similarity)
+                    return result.model_copy(deep=True)
+        return None
+
+    def store(self, bucket: str, embedding: List[float], content: str, result: AnalyzeResponse):
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO semantic_cache (bucket, embedding, tail_digest, result) VALUES (?, ?, ?, ?)",
+                (bucket, vector.tobytes(), _tail_digest(content), result.model_dump_json()),
+            )
+            # Keep only the newest max_entries rows
+            self._conn.execute(
+                "DELETE FROM semantic_cache WHERE id <= "
+                "(SELECT id FROM semantic_cache ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+            self._sync()
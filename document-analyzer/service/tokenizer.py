@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import Optional
+
+import tiktoken
+
+from utils.logger import logger
+
+
+LLM_MODEL = "gpt-4o"
+# gpt-4o context window, minus room for the instructions/criteria and the JSON answer
+MODEL_CONTEXT_TOKENS = 128000
+PROMPT_OVERHEAD_TOKENS = 4000
+RESPONSE_TOKEN_BUDGET = 4000
+MAX_CONTENT_TOKENS = MODEL_CONTEXT_TOKENS - PROMPT_OVERHEAD_TOKENS - RESPONSE_TOKEN_BUDGET
+
+TRUNCATION_MARKER = "\n... [Content Truncated]"
+
+
+@lru_cache(maxsize=None)
+def get_encoding() -> Optional[tiktoken.Encoding]:
+    """
+    Loads the tokenizer for LLM_MODEL on first use and keeps it for the process.
+    tiktoken downloads the encoding unless it is in TIKTOKEN_CACHE_DIR (the Docker image
+    pre-fetches it). If loading fails, returns None and callers fall back to counting
+    characters, which never undercounts tokens for non-CJK text.
+    """
+    try:
+        return tiktoken.encoding_for_model(LLM_MODEL)
+    except Exception as e:
+        logger.warning("Failed to load tiktoken encoding for %s, falling back to character counts: %s", LLM_MODEL, e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_token_budget(text: str, budget: int = MAX_CONTENT_TOKENS) -> str:
+    """Cuts text to at most budget tokens, appending TRUNCATION_MARKER if anything was cut."""
+    encoding = get_encoding()
+    if encoding is None:
+        if len(text) <= budget:
+            return text
+        logger.warning("Content length (%s chars) is very long. Truncating to %s chars for LLM analysis.", len(text), budget)
+        return text[:budget] + TRUNCATION_MARKER
+    token_ids = encoding.encode(text, disallowed_special=())
+    if len(token_ids) <= budget:
+        return text
+    logger.warning("Content length (%s tokens) is very long. Truncating to %s tokens for LLM analysis.", len(token_ids), budget)
+    return encoding.decode(token_ids[:budget]) + TRUNCATION_MARKER
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The app imports its modules relative to document-analyzer/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings requires a key at import time; no request in the tests reaches OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
@@ -0,0 +1,75 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from service.analyzer_service import get_analyzer_service
+
+
+class _UnusedService:
+    async def analyze_document(self, **kwargs):
+        raise AssertionError("criteria validation should fail before the service is called")
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_analyzer_service] = _UnusedService
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize(
+    "criteria, message",
+    [
+        ("not json", "Invalid criteria format: Criteria is not a valid JSON string."),
+        ("[1, 2]", "Invalid criteria format: Criteria must be a valid JSON object string."),
+        ('{"clarity": 1}', "Invalid criteria format: Criteria must be a valid JSON object string."),
+    ],
+)
+def test_invalid_criteria_returns_400(client, criteria, message):
+    response = client.post(
+        "/v1/analyzer/document",
+        files={"file": ("essay.txt", b"Some text", "text/plain")},
+        data={"filename": "essay.txt", "criteria": criteria},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"code": 400, "message": message, "data": {}}
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("essay.xyz", b"Unsupported extension"),
+        ("essay.pdf", b"not a pdf"),
+        ("essay.docx", b"not a docx"),
+        ("essay.txt", b"\xff\xfe invalid utf-8"),
+    ],
+)
+def test_unparseable_document_returns_parsing_error(filename, content):
+    # Real service: parsing fails before any OpenAI call
+    response = TestClient(app).post(
+        "/v1/analyzer/document",
+        files={"file": (filename, content, "application/octet-stream")},
+        data={"filename": filename},
+    )
+    assert response.status_code == 500
+    assert response.json() == {"code": 500, "message": "Document parsing error", "data": {}}
+
+
+class _StubService:
+    async def analyze_document(self, **kwargs):
+        return {"score": 8.5}
+
+
+def test_success_is_serialized_through_response_model():
+    app.dependency_overrides[get_analyzer_service] = _StubService
+    try:
+        response = TestClient(app).post(
+            "/v1/analyzer/document",
+            files={"file": ("essay.txt", b"Some text", "text/plain")},
+            data={"filename": "essay.txt"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"code": 200, "message": "Success", "data": {"score": 8.5}}
@@ -0,0 +1,82 @@
+import asyncio
+import io
+
+import pytest
+
+from config import settings
+from model.dto import AnalyzeResponse
+from service import analyzer_service
+from service.analyzer_service import AnalyzerService, get_analyzer_service
+
+
+def test_service_dependency_is_shared():
+    async def resolve_concurrently():
+        return await asyncio.gather(*(get_analyzer_service() for _ in range(5)))
+
+    services = asyncio.run(resolve_concurrently())
+    assert isinstance(services[0], AnalyzerService)
+    assert all(service is services[0] for service in services)
+
+
+class _CountingService(AnalyzerService):
+    """Real caching and parsing, with the LLM call replaced by a counter."""
+
+    def __init__(self):
+        self.async_client = None
+        self.llm_calls = 0
+
+    async def _call_llm_for_analysis(self, content, criteria):
+        self.llm_calls += 1
+        return {"feedback": f"call {self.llm_calls}", "scores": {name: 50 for name in criteria}}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "enable_cache", True)
+    monkeypatch.setattr(settings, "enable_semantic_cache", False)
+    analyzer_service._RESULT_CACHE.clear()
+    yield _CountingService()
+    analyzer_service._RESULT_CACHE.clear()
+
+
+def _analyze(service, content: bytes, filename="essay.txt", criteria=None) -> AnalyzeResponse:
+    return asyncio.run(service.analyze_document(io.BytesIO(content), filename, criteria))
+
+
+def test_repeated_upload_hits_result_cache(service):
+    first = _analyze(service, b"Same essay")
+    second = _analyze(service, b"Same essay")
+    assert service.llm_calls == 1
+    assert second == first
+    # Callers get a copy, mutating it must not change the cached entry
+    second.scores["Clarity"] = 0
+    assert _analyze(service, b"Same essay").scores["Clarity"] == 50
+
+
+def test_result_cache_key_includes_criteria_and_extension(service):
+    _analyze(service, b"Same essay")
+    _analyze(service, b"Same essay", criteria={"Depth": "Is it deep?"})
+    _analyze(service, b"Same essay", filename="essay.md")
+    assert service.llm_calls == 3
+
+
+def test_result_cache_evicts_least_recently_used(service, monkeypatch):
+    monkeypatch.setattr(settings, "cache_max_size", 2)
+    _analyze(service, b"a")
+    _analyze(service, b"b")
+    _analyze(service, b"a")  # hit, a becomes the most recently used
+    _analyze(service, b"c")  # evicts b
+    assert service.llm_calls == 3
+    _analyze(service, b"a")
+    assert service.llm_calls == 3
+    _analyze(service, b"b")
+    assert service.llm_calls == 4
+    assert len(analyzer_service._RESULT_CACHE) == 2
+
+
+def test_result_cache_can_be_disabled(service, monkeypatch):
+    monkeypatch.setattr(settings, "enable_cache", False)
+    _analyze(service, b"Same essay")
+    _analyze(service, b"Same essay")
+    assert service.llm_calls == 2
+    assert not analyzer_service._RESULT_CACHE
@@ -0,0 +1,80 @@
+import io
+from collections import Counter
+
+import pytest
+
+from service import document_parser, tokenizer
+from service.tokenizer import TRUNCATION_MARKER
+
+BUDGET = 100
+
+
+class _FakePage:
+    def __init__(self, text):
+        self.text = text
+        self.extracted = 0
+
+    def extract_text(self):
+        self.extracted += 1
+        return self.text
+
+
+class _FakeReader:
+    def __init__(self, pages):
+        self.pages = pages
+
+
+@pytest.fixture
+def token_calls(monkeypatch):
+    """Counts characters as tokens, so budgets are deterministic, and records every count_tokens call."""
+    monkeypatch.setattr(tokenizer, "get_encoding", lambda: None)
+    monkeypatch.setattr(document_parser, "MAX_CONTENT_TOKENS", BUDGET)
+    calls = Counter()
+
+    def count_tokens(text):
+        calls[text] += 1
+        return tokenizer.count_tokens(text)
+
+    monkeypatch.setattr(document_parser, "count_tokens", count_tokens)
+    return calls
+
+
+def _parse(monkeypatch, pages):
+    monkeypatch.setattr(document_parser.pypdf, "PdfReader", lambda file: _FakeReader(pages))
+    return document_parser._parse_pdf(io.BytesIO(), "essay.pdf")
+
+
+def test_pdf_under_the_byte_bound_is_never_tokenized(monkeypatch, token_calls):
+    pages = [_FakePage("a" * 30), _FakePage(""), _FakePage("b" * 30)]
+    assert _parse(monkeypatch, pages) == "a" * 30 + "\n" + "b" * 30
+    assert not token_calls
+
+
+def test_pdf_stops_extracting_at_the_token_budget(monkeypatch, token_calls):
+    pages = [_FakePage(str(i) * 40) for i in range(5)]
+    text = _parse(monkeypatch, pages)
+
+    assert text.endswith(TRUNCATION_MARKER)
+    assert len(text) - len(TRUNCATION_MARKER) == BUDGET
+    assert text.startswith("0" * 40 + "\n" + "1" * 40 + "\n" + "2")
+    # Pages after the one that crossed the budget are never extracted
+    assert [page.extracted for page in pages] == [1, 1, 1, 0, 0]
+    # Each page is tokenized at most once
+    assert all(count == 1 for count in token_calls.values())
+
+
+def test_pdf_byte_bound_does_not_truncate_multibyte_text_early(monkeypatch, token_calls):
+    # 2 bytes per character: the byte bound passes the budget, the real count does not
+    pages = [_FakePage("é" * 40), _FakePage("è" * 40)]
+    assert _parse(monkeypatch, pages) == "é" * 40 + "\n" + "è" * 40
+
+
+def test_pdf_exactly_filling_the_budget_is_not_truncated(monkeypatch, token_calls):
+    pages = [_FakePage("a" * 49), _FakePage("b" * 50)]
+    assert _parse(monkeypatch, pages) == "a" * 49 + "\n" + "b" * 50
+
+
+def test_text_documents_are_cut_to_the_token_budget(monkeypatch):
+    monkeypatch.setattr(tokenizer, "get_encoding", lambda: None)
+    text = document_parser.parse_document(io.BytesIO(b"x" * (tokenizer.MAX_CONTENT_TOKENS + 10)), "essay.txt")
+    assert text == "x" * tokenizer.MAX_CONTENT_TOKENS + TRUNCATION_MARKER
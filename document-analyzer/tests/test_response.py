@@ -0,0 +1,15 @@
+from utils.response import DocanalyzerResponse, response_formatter
+
+
+def test_wraps_plain_data():
+    response = response_formatter({"score": 1})
+    assert (response.code, response.message, response.data) == (200, "Success", {"score": 1})
+
+
+def test_none_becomes_empty_data():
+    assert response_formatter(None).data == {}
+
+
+def test_passes_wrapped_response_through():
+    wrapped = DocanalyzerResponse(code=201, message="Created", data={})
+    assert response_formatter(wrapped) is wrapped
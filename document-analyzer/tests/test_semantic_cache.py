@@ -0,0 +1,145 @@
+import asyncio
+import sqlite3
+
+import numpy as np
+import pytest
+
+from config import settings
+from model.dto import AnalyzeResponse
+from service import analyzer_service
+from service.semantic_cache import EMBEDDING_DIM, EMBEDDING_INPUT_CHARS, SemanticCache
+
+_RNG = np.random.default_rng(0)
+
+
+def _vector():
+    vector = _RNG.standard_normal(EMBEDDING_DIM)
+    return list(vector / np.linalg.norm(vector))
+
+
+def _near(vector, noise=0.001):
+    return list(np.asarray(vector) + _RNG.standard_normal(EMBEDDING_DIM) * noise)
+
+
+def _result(feedback):
+    return AnalyzeResponse(feedback=feedback, scores={"Clarity": 80}, overall_score=80)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "semantic_cache.db")
+
+
+def _lookup_feedback(cache, bucket, embedding, content):
+    result = cache.lookup(bucket, embedding, content)
+    return result.feedback if result is not None else None
+
+
+def test_near_duplicate_hits_and_distant_document_misses(db_path):
+    cache = SemanticCache(db_path, threshold=0.97, max_entries=100)
+    vector = _vector()
+    cache.store("rubric", vector, "essay", _result("stored"))
+    assert _lookup_feedback(cache, "rubric", _near(vector), "essay") == "stored"
+    assert cache.lookup("rubric", _vector(), "essay") is None
+
+
+def test_lookup_returns_a_copy(db_path):
+    cache = SemanticCache(db_path, threshold=0.97, max_entries=100)
+    vector = _vector()
+    cache.store("rubric", vector, "essay", _result("stored"))
+    cache.lookup("rubric", vector, "essay").scores["Clarity"] = 0
+    assert cache.lookup("rubric", vector, "essay").scores["Clarity"] == 80
+
+
+def test_buckets_are_isolated(db_path):
+    cache = SemanticCache(db_path, threshold=0.97, max_entries=100)
+    vector = _vector()
+    cache.store("rubric-a", vector, "essay", _result("a"))
+    assert cache.lookup("rubric-b", vector, "essay") is None
+    cache.store("rubric-b", _near(vector), "essay", _result("b"))
+    assert _lookup_feedback(cache, "rubric-a", vector, "essay") == "a"
+    assert _lookup_feedback(cache, "rubric-b", vector, "essay") == "b"
+
+
+def test_text_past_the_embedded_prefix_must_match(db_path):
+    cache = SemanticCache(db_path, threshold=0.97, max_entries=100)
+    vector = _vector()
+    template = "x" * EMBEDDING_INPUT_CHARS
+    cache.store("rubric", vector, template + " answer one", _result("one"))
+    # Same template, so the embedding is the same, but a different answer
+    assert cache.lookup("rubric", vector, template + " answer two") is None
+    # Whitespace-only differences still hit
+    assert _lookup_feedback(cache, "rubric", vector, template + "  answer\n one") == "one"
+
+
+def test_next_candidate_is_checked_when_the_nearest_fails_the_tail_check(db_path):
+    cache = SemanticCache(db_path, threshold=0.97, max_entries=100)
+    vector = _vector()
+    template = "x" * EMBEDDING_INPUT_CHARS
+    cache.store("rubric", _near(vector), template + " answer two", _result("two"))
+    cache.store("rubric", vector, template + " answer one", _result("one"))
+    assert _lookup_feedback(cache, "rubric", vector, template + " answer two") == "two"
+
+
+def test_oldest_entries_are_evicted_from_sqlite_and_memory(db_path):
+    cache = SemanticCache(db_path, threshold=0.97, max_entries=3)
+    vectors = [_vector() for _ in range(6)]
+    for i, vector in enumerate(vectors):
+        cache.store(f"bucket-{i}", vector, "essay", _result(str(i)))
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0] == 3
+    assert [_lookup_feedback(cache, f"bucket-{i}", v, "essay") for i, v in enumerate(vectors)] == [
+        None, None, None, "3", "4", "5"
+    ]
+    # Evicted buckets leave nothing behind and the index never grows past max_entries
+    assert set(cache._bucket_sizes) == {"bucket-3", "bucket-4", "bucket-5"}
+    assert cache._index.get_max_elements() == 3
+
+
+def test_many_distinct_buckets_share_one_bounded_index(db_path):
+    cache = SemanticCache(db_path, threshold=0.97, max_entries=50)
+    for i in range(200):
+        cache.store(f"bucket-{i}", _vector(), "essay", _result(str(i)))
+    assert len(cache._entries) == 50
+    assert len(cache._bucket_sizes) == 50
+    assert cache._index.get_max_elements() == 50
+
+
+def test_workers_see_each_others_entries_and_evictions(db_path):
+    worker_a = SemanticCache(db_path, threshold=0.97, max_entries=2)
+    worker_b = SemanticCache(db_path, threshold=0.97, max_entries=2)
+    first, second, third = _vector(), _vector(), _vector()
+
+    worker_a.store("rubric", first, "essay", _result("first"))
+    assert _lookup_feedback(worker_b, "rubric", first, "essay") == "first"
+
+    worker_b.store("rubric", second, "essay", _result("second"))
+    worker_b.store("rubric", third, "essay", _result("third"))
+    assert worker_a.lookup("rubric", first, "essay") is None
+    assert _lookup_feedback(worker_a, "rubric", third, "essay") == "third"
+
+
+def test_entries_survive_a_restart(db_path):
+    vector = _vector()
+    SemanticCache(db_path, threshold=0.97, max_entries=100).store("rubric", vector, "essay", _result("stored"))
+    reopened = SemanticCache(db_path, threshold=0.97, max_entries=100)
+    assert _lookup_feedback(reopened, "rubric", vector, "essay") == "stored"
+
+
+def test_service_opens_one_shared_cache_off_the_event_loop(db_path, monkeypatch):
+    monkeypatch.setattr(settings, "enable_semantic_cache", True)
+    monkeypatch.setattr(settings, "semantic_cache_path", db_path)
+    monkeypatch.setattr(analyzer_service, "_SEMANTIC_CACHE", None)
+
+    async def open_concurrently():
+        return await asyncio.gather(*(analyzer_service._get_semantic_cache() for _ in range(5)))
+
+    caches = asyncio.run(open_concurrently())
+    assert isinstance(caches[0], SemanticCache)
+    assert all(cache is caches[0] for cache in caches)
+
+
+def test_service_skips_the_cache_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "enable_semantic_cache", False)
+    assert asyncio.run(analyzer_service._get_semantic_cache()) is None
@@ -1,6 +1,7 @@
-from typing import Any, Union, TypeVar, Generic
+from functools import singledispatch
+from typing import Any, TypeVar, Generic
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 DataModelType = TypeVar("DataModelType")
 
@@ -11,12 +12,22 @@ class DocanalyzerResponse(BaseModel, Generic[DataModelType]):
     data: DataModelType
 
 
-def response_formatter(data: Union[DocanalyzerResponse, Any] = None):
-    if isinstance(data, DocanalyzerResponse):
-        return data
-    else:
-        return DocanalyzerResponse(code=200, message="Success", data=data if data is not None else {})
+# Built once, reused for every error payload
+_ADAPTER = TypeAdapter(DocanalyzerResponse)
+
+
+@singledispatch
+def response_formatter(data: Any):
+    """Wraps data in a success response. Dispatches on the type of data, so pass it positionally."""
+    # Fields are known to be valid here; FastAPI validates against response_model anyway
+    return DocanalyzerResponse.model_construct(code=200, message="Success", data=data if data is not None else {})
+
+
+@response_formatter.register
+def _(data: DocanalyzerResponse):
+    # Already wrapped, return as is
+    return data
 
 
 def error_response(code: int, message: str):
-    return DocanalyzerResponse(code=code, message=message, data={}).model_dump()
+    return _ADAPTER.dump_python(DocanalyzerResponse.model_construct(code=code, message=message, data={}), mode="json")